@@ -1,6 +1,77 @@
 import numpy as np
+from functools import lru_cache
+from numba import njit, prange
 
-def best_respond(V, bnow, T, kappa, lower_limit, upper_limit):
+@lru_cache(maxsize=32)
+def _make_br_dp(T, lower_limit, upper_limit):
+    """
+    Build the DP kernel for best_respond, specialized to fixed (T, lower_limit, upper_limit).
+
+    These are captured as compile-time constants, so the loop over q has a fixed trip count and the index
+    arithmetic is constant-folded. Each specialization is compiled in memory on first call, only for the cost/action
+    dtypes actually used. It is not cached on disk, since numba's disk cache records the name this module was imported
+    under and the module is imported both as BR and as BestResponseDynamics.BR. At most 32 specializations are kept,
+    so a sweep over many (T, limits) settings does not accumulate compiled kernels without bound.
+
+    The kernel populates the (T, s_size) DP table of optimal actions dpaction, using the (2, s_size) array costs
+    as rolling rows of optimal costs. At time t, A can have between [V-upper_limit*t, V-lower_limit*t] shares remaining.
+    """
+    @njit(parallel=True)
+    def br_dp(V, bnow, b, kappa, costs, dpaction):
+        # remaining shares s are stored at index s - min_rem_T
+        min_rem_T = V - upper_limit * T
+
+        # optimal costs are only needed for the next time step, so keep two rows of the cost table
+        nxt = costs[0] # optimal costs at time t+1
+        cur = costs[1] # optimal costs at time t
+
+        # initialization: on last step (t = T), must buy/sell all remaining shares
+        for s in range(min_rem_T, V - lower_limit * T + 1):
+            if lower_limit <= s <= upper_limit: # must adhere to trading limits
+                i = s - min_rem_T
+                nxt[i] = s*((s + bnow[T-1]) + kappa*((V-s) + b[T-2]))
+                dpaction[T-1,i] = s
+
+        # populate DP table from time step T-2 to 1
+        for t in range(T-2, 0, -1):
+            # entries of row t only depend on row t+1, so shares remaining can be processed in parallel
+            min_rem_t = V - upper_limit * t
+            for si in prange((upper_limit - lower_limit) * t + 1):
+                s = min_rem_t + si # shares remaining at time t
+                i = s - min_rem_T # corresponding index in DP table
+                perm_impact = kappa*((V-s) + b[t-1]) # permanent impact (same for every q): A holds V-s shares, B holds b[t-1] shares
+
+                # find optimal number of shares to trade now
+                mincost = np.inf
+                minq = 0
+                for q in range(lower_limit, upper_limit + 1): # possible shares to trade
+                    next_i = s - q - min_rem_T # index of remaining shares after buying q shares
+                    thisval = nxt[next_i] + q*((q + bnow[t]) + perm_impact)
+                    if thisval < mincost: # update opt q for this s
+                        mincost = thisval
+                        minq = q
+
+                cur[i] = mincost
+                dpaction[t,i] = minq
+
+            # row t becomes the next row for time step t-1
+            cur, nxt = nxt, cur
+
+        # at first step, all V shares remain and permanent impact is 0
+        if T > 1:
+            mincost = np.inf
+            minq = 0
+            for q in range(lower_limit, upper_limit + 1): # possible shares to trade
+                thisval = nxt[V - q - min_rem_T] + q*(q + bnow[0])
+                if thisval < mincost: # update opt q
+                    mincost = thisval
+                    minq = q
+
+            dpaction[0,V - min_rem_T] = minq
+
+    return br_dp
+
+def best_respond(V, bnow, T, kappa, lower_limit, upper_limit, use_float32=False):
     """
     Compute best response from class of strategies that buy shares between [lower_limit, upper_limit] at every round.
     
@@ -18,71 +89,60 @@ def best_respond(V, bnow, T, kappa, lower_limit, upper_limit):
         Lower limit of shares that can be bought at each step
     upper_limit : int
         Upper limit of shares that can be bought at each step
+    use_float32 : bool
+        Store DP costs in float32 to halve memory traffic. Costs that nearly tie may then be ordered
+        incorrectly, so the result is only optimal up to float32 rounding. Defaults to False (float64)
         
     Returns:
     --------
     anow : array
         Optimal trading schedule (shares bought at each time step)
+
+    Raises:
+    -------
+    ValueError
+        If the trading limits do not satisfy lower_limit <= 0 <= upper_limit, or bnow has fewer than T entries
     """
+    # the DP table layout below assumes the reachable range of remaining shares widens every step,
+    # and the compiled DP does not check bounds, so reject limits that would index outside it
+    if not lower_limit <= 0 <= upper_limit:
+        raise ValueError(f"best_respond requires lower_limit <= 0 <= upper_limit, got [{lower_limit}, {upper_limit}]")
+
+    bnow = np.ascontiguousarray(bnow, dtype=np.float64)
+    if len(bnow) < T:
+        raise ValueError(f"best_respond requires bnow to have at least T={T} entries, got {len(bnow)}")
+
     # cumulative shares held by opponent each time step
-    b = np.array([np.sum(bnow[:i+1]) for i in range(T)])
+    b = np.cumsum(bnow)
 
-    # helper functions to determine min/max number of remaining shares at each time step
     # can hold between [lower_limit*t, upper_limit*t] shares at time t, and so shares remaining are between [V-upper_limit*t, V-lower_limit*t] at time t
-    def min_remaining(t):
-        return V - upper_limit * t
-    def max_remaining(t):
-        return V - lower_limit * t
+    # the range is widest at t = T, and remaining shares s are stored at index s - min_rem_T of the DP table
+    min_rem_T = int(V - upper_limit * T)
+    max_rem_T = int(V - lower_limit * T)
 
     # range of remaining shares
-    s_size = max_remaining(T) - min_remaining(T) + 1
-
-    dptable = np.full((T, s_size), np.inf) # initialize table of optimal costs
-    dpaction = np.zeros((T, s_size))  # initialize table of optimal actions
-
-    # helper function to map remaining shares s at time t to DP table index
-    def s_to_index(s):
-        return s - min_remaining(T)
-
-    # initialization: on last step (t = T), must buy/sell all remaining shares
-    for s in range(min_remaining(T), max_remaining(T) + 1):
-        if lower_limit <= s <= upper_limit: # must adhere to trading limits
-            i = s_to_index(s)
-            dptable[T-1,i] = s*((s + bnow[T-1]) + kappa*((V-s) + b[T-2]))
-            dpaction[T-1,i] = s
-
-    # populate DP table from time step T-2 to 0
-    for t in reversed(range(T-1)): 
-        for s in range(min_remaining(t), max_remaining(t) + 1):  # shares remaining at time r
-            i = s_to_index(s) # corresponding index in DP table
-
-            # find optimal number of shares to trade now
-            mincost = np.inf
-            for q in range(lower_limit, upper_limit + 1): # possible shares to trade
-                next_s = s - q # remaining shares after buying q shares
-
-                #if min_remaining(t+1) <= next_s <= max_remaining(t+1):
-                next_i = s_to_index(next_s) # corresponding index
-                if t == 0:
-                    # at first step, permanent impact is 0
-                    thisval = dptable[t+1,next_i] + q*(q + bnow[t])
-                else:
-                    thisval = dptable[t+1,next_i] + q*((q + bnow[t]) + kappa*((V-s) + b[t-1])) # A holds V-s shares, B holds b[t-1] shares
-
-                if thisval < mincost: # update opt q for this s
-                    dptable[t,i] = thisval
-                    dpaction[t,i] = q
-                    mincost = thisval
+    s_size = max_rem_T - min_rem_T + 1
+
+    # populate table of optimal actions (kept in full for backtracking)
+    # actions are integers in [lower_limit, upper_limit], so use the smallest integer type that fits them
+    if np.iinfo(np.int16).min <= lower_limit and upper_limit <= np.iinfo(np.int16).max:
+        action_dtype = np.int16
+    else:
+        action_dtype = np.int32
+    dpaction = np.zeros((T, s_size), dtype=action_dtype)
+    br_dp = _make_br_dp(int(T), int(lower_limit), int(upper_limit))
+    costs = np.full((2, s_size), np.inf, dtype=np.float32 if use_float32 else np.float64) # rolling rows of optimal costs
+    br_dp(int(V), bnow, b, float(kappa), costs, dpaction)
 
     # compute optimal strategy for A from DP table
     anow = np.zeros(T) # a': trading schedule for A
 
     # traverse DP table, starting from time step 0 with V shares remaining
-    volrem = V
+    volrem = int(V)
     for t in range(T):
-        i = s_to_index(int(volrem))
+        i = volrem - min_rem_T # corresponding index in DP table
         anow[t] = dpaction[t,i]
-        volrem -= anow[t]
+        volrem -= int(dpaction[t,i])
 
     # return optimal strategy
     return anow
@@ -90,6 +150,9 @@ def best_respond(V, bnow, T, kappa, lower_limit, upper_limit):
 def total_cost(anow, bnow, kappa):
     """
     Calculate total cost of anow against bnow.
+
+    Schedules may also be batches of schedules with time along the last axis; leading axes
+    are broadcast against each other and one cost is returned per pair of schedules.
     
     Parameters:
     -----------
@@ -102,14 +165,19 @@ def total_cost(anow, bnow, kappa):
         
     Returns:
     --------
-    total_cost : float
-        Total cost for player A
+    total_cost : float or array
+        Total cost for player A (one per broadcast pair of schedules)
     """
-    a = np.array([np.sum(anow[:i]) for i in range(len(anow))]) # A's cumulative trading schedule (0 at t=0)
-    b = np.array([np.sum(bnow[:i]) for i in range(len(bnow))]) # B's cumulative trading schedule (0 at t=0)
+    anow = np.asarray(anow, dtype=float)
+    bnow = np.asarray(bnow, dtype=float)
+
+    # cumulative trading schedules (0 at t=0)
+    a = np.zeros_like(anow) # A's cumulative trading schedule
+    np.cumsum(anow[..., :-1], axis=-1, out=a[..., 1:])
+    b = np.zeros_like(bnow) # B's cumulative trading schedule
+    np.cumsum(bnow[..., :-1], axis=-1, out=b[..., 1:])
 
-    total_cost = 0
-    for t in range(len(anow)):
-        total_cost += ((anow[t] + bnow[t]) * anow[t]) + (kappa * (a[t] + b[t]) * anow[t])
+    # sum over time of anow * (anow + bnow + kappa*(a + b)), as a single contraction over the time axis
+    total_cost = np.einsum('...t,...t->...', anow, anow + bnow + kappa * (a + b))
 
     return total_cost
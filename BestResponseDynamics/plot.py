@@ -1,7 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
-def plot_strategies_instantaneous(anow, bnow):
+def plot_strategies_instantaneous(anow, bnow, ax=None):
     """
     Plot instantaneous trading strategies for both players.
     
@@ -11,26 +11,32 @@ def plot_strategies_instantaneous(anow, bnow):
         Trading schedule for player A
     bnow : array-like
         Trading schedule for player B
+    ax : matplotlib Axes, optional
+        Axes to draw on; if None, a new figure is created, shown, and closed
     """
     T = len(anow)
 
     # Create the bar plot
-    f, ax = plt.subplots(figsize=(5,3))
-    plt.bar(np.arange(T) - 0.2, anow, width=0.4, label="a'", color='orange')
-    plt.bar(np.arange(T) + 0.2, bnow, width=0.4, label="b'", color='cornflowerblue')
+    fig = None
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(5,3))
+    ax.bar(np.arange(T) - 0.2, anow, width=0.4, label="a'", color='orange')
+    ax.bar(np.arange(T) + 0.2, bnow, width=0.4, label="b'", color='cornflowerblue')
 
     # Add labels and title
-    plt.xlabel('Time Step')
-    plt.ylabel('Shares Bought')
-    plt.title("Comparison of a' and b'")
+    ax.set_xlabel('Time Step')
+    ax.set_ylabel('Shares Bought')
+    ax.set_title("Comparison of a' and b'")
 
     # Add legend
-    plt.legend()
+    ax.legend()
 
-    # Show the plot
-    plt.show()
+    # Show the plot, then close the figure so repeated calls don't accumulate open figures
+    if fig is not None:
+        plt.show()
+        plt.close(fig)
 
-def plot_strategies_cumulative(anow, bnow):
+def plot_strategies_cumulative(anow, bnow, ax=None):
     """
     Plot cumulative trading strategies for both players.
     
@@ -40,6 +46,8 @@ def plot_strategies_cumulative(anow, bnow):
         Trading schedule for player A
     bnow : array-like
         Trading schedule for player B
+    ax : matplotlib Axes, optional
+        Axes to draw on; if None, a new figure is created, shown, and closed
     """
     T = len(anow)
     Va = sum(anow)
@@ -50,20 +58,25 @@ def plot_strategies_cumulative(anow, bnow):
     b = np.cumsum(bnow)
 
     # Create the bar plot
-    plt.bar(np.arange(T) - 0.2, a, width=0.4, label='a', color='orange')
-    plt.bar(np.arange(T) + 0.2, b, width=0.4, label='b', color='cornflowerblue')
+    fig = None
+    if ax is None:
+        fig, ax = plt.subplots()
+    ax.bar(np.arange(T) - 0.2, a, width=0.4, label='a', color='orange')
+    ax.bar(np.arange(T) + 0.2, b, width=0.4, label='b', color='cornflowerblue')
 
     # Plot target shares
-    plt.axhline(Va, linestyle='dashed', color='gold', label='Va')
-    plt.axhline(Vb, linestyle='dashed', color='lightblue', label='Vb')
+    ax.axhline(Va, linestyle='dashed', color='gold', label='Va')
+    ax.axhline(Vb, linestyle='dashed', color='lightblue', label='Vb')
 
     # Add labels and title
-    plt.xlabel('Time Step')
-    plt.ylabel('Shares Held')
-    plt.title('Comparison of a and b')
+    ax.set_xlabel('Time Step')
+    ax.set_ylabel('Shares Held')
+    ax.set_title('Comparison of a and b')
 
     # Add legend
-    plt.legend()
+    ax.legend()
 
-    # Show the plot
-    plt.show() 
\ No newline at end of file
+    # Show the plot, then close the figure so repeated calls don't accumulate open figures
+    if fig is not None:
+        plt.show()
+        plt.close(fig)
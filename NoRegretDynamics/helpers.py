@@ -5,6 +5,14 @@ sys.path.append('..')
 from BestResponseDynamics.BR import best_respond, total_cost
 
 
+def _action_key(action):
+    """
+    Hashable key for an action: the raw bytes of its float64 trading schedule.
+    Adding 0.0 turns -0.0 into 0.0, so both compare equal as they did when actions were keyed by tuples.
+    """
+    return (np.asarray(action, dtype=np.float64) + 0.0).tobytes()
+
+
 def regret(cumulative_cost, opponent_actions, V, T, kappa, lower_limit, upper_limit):
     """
     Computes cumulative external regret
@@ -23,8 +31,8 @@ def regret(cumulative_cost, opponent_actions, V, T, kappa, lower_limit, upper_li
     """
     r = len(opponent_actions)
     
-    # compute sum of opponent actions
-    bnow_r = np.add.reduce(opponent_actions) / r
+    # compute average of opponent actions
+    bnow_r = np.asarray(opponent_actions, dtype=float).mean(axis=0)
 
     # compute best fixed action by best responding to sum of opponent actions
     best_action = best_respond(V, bnow_r, T, kappa, lower_limit, upper_limit)
@@ -35,7 +43,7 @@ def regret(cumulative_cost, opponent_actions, V, T, kappa, lower_limit, upper_li
     return cumulative_cost - best_cost
 
 
-def swap_regret(p1_actions, p2_actions, Va, T, kappa, lower_limit, upper_limit):
+def swap_regret(p1_actions, p2_actions, Va, T, kappa, lower_limit, upper_limit, pool=None):
     """
     Computes cumulative swap regret of P1 against P2
 
@@ -47,35 +55,42 @@ def swap_regret(p1_actions, p2_actions, Va, T, kappa, lower_limit, upper_limit):
         kappa (float): Market impact parameter
         lower_limit (float): Minimum number of shares that can be traded in one time step
         upper_limit (float): Maximum number of shares that can be traded in one time step
+        pool (multiprocessing.pool.Pool, optional): Pool used to compute the regret of each action in parallel.
+            Create it once per sweep, with the 'spawn' start method since forking after numba has started its
+            worker threads is unsafe. Each worker's DP is itself multithreaded, so keep the pool small.
+            Defaults to None (serial).
 
     Returns:
         float: Cumulative swap regret
     """
 
-    n = len(p1_actions)
+    # Stack actions into (rounds, T) arrays
+    p1_actions = np.asarray(p1_actions, dtype=float)
+    p2_actions = np.asarray(p2_actions, dtype=float)
 
-    # Compute costs
-    p1_costs = []
-    for t in range(n):
-        p1_costs.append(total_cost(p1_actions[t], p2_actions[t], kappa))
-
-    # Convert to tuples for hashing
-    p1_actions = [tuple(a) for a in p1_actions]
-    p2_actions = [tuple(a) for a in p2_actions]
+    # Compute costs of every round at once
+    p1_costs = total_cost(p1_actions, p2_actions, kappa)
 
     # Group indices where Player 1 plays a specific action
     action_to_indices = defaultdict(list)
     for t, a1 in enumerate(p1_actions):
-        action_to_indices[a1].append(t)
-
-    total_regret = 0
+        action_to_indices[_action_key(a1)].append(t)
 
+    tasks = []
     for a1, indices in action_to_indices.items():
         # Get the subsequence of Player 2's actions where Player 1 played a1
-        p2_subseq = [p2_actions[t] for t in indices]
+        p2_subseq = p2_actions[indices]
         
-        subseq_cost = np.sum([p1_costs[t] for t in indices])
-        total_regret += regret(subseq_cost, p2_subseq, Va, T, kappa, lower_limit, upper_limit)
+        subseq_cost = np.sum(p1_costs[indices])
+        tasks.append((subseq_cost, p2_subseq, Va, T, kappa, lower_limit, upper_limit))
+
+    # regrets for different actions are independent, so they can be computed by the caller's pool
+    if pool is None:
+        regrets = [regret(*task) for task in tasks]
+    else:
+        regrets = pool.starmap(regret, tasks)
+
+    total_regret = sum(regrets)
 
     return total_regret
 
@@ -93,20 +108,25 @@ def marginal_cost(p1_actions, p2_actions, kappa):
         float: Expected cost under the product of marginal distributions
     """
     num_rounds = len(p1_actions)
+    if num_rounds == 0:
+        return 0.0
 
     # construct marginal distributions over p1 and p2 actions
-    p1_frequencies = Counter([tuple(p1_action) for p1_action in p1_actions])
+    p1_frequencies = Counter([_action_key(p1_action) for p1_action in p1_actions])
     p1_dist = {action: freq / num_rounds for action, freq in p1_frequencies.items()}
-    p2_frequencies = Counter([tuple(p2_action) for p2_action in p2_actions])
+    p2_frequencies = Counter([_action_key(p2_action) for p2_action in p2_actions])
     p2_dist = {action: freq / num_rounds for action, freq in p2_frequencies.items()}
     
-    cost = 0
-    for a1, freq1 in p1_dist.items():
-        for a2, freq2 in p2_dist.items():
-            weight = freq1 * freq2
-            cost += total_cost(a1, a2, kappa) * weight
-    
-    return cost
+    # stack distinct actions (recovered from their keys) and their probabilities
+    A1 = np.frombuffer(b''.join(p1_dist.keys()), dtype=np.float64).reshape(len(p1_dist), -1)
+    freq1 = np.array(list(p1_dist.values()))
+    A2 = np.frombuffer(b''.join(p2_dist.keys()), dtype=np.float64).reshape(len(p2_dist), -1)
+    freq2 = np.array(list(p2_dist.values()))
+
+    # cost[i, j] = total cost of A1[i] against A2[j]
+    cost = total_cost(A1[:, None, :], A2[None, :, :], kappa)
+
+    return freq1 @ cost @ freq2
 
 
 def dist_to_nash(p1_actions, p2_actions, Va, T, kappa, lower_limit, upper_limit):
@@ -128,7 +148,7 @@ def dist_to_nash(p1_actions, p2_actions, Va, T, kappa, lower_limit, upper_limit)
     actual_cost = marginal_cost(p1_actions, p2_actions, kappa)
 
     # compute average strategy of P2
-    p2_avg_action = [sum(elements) / len(p2_actions) for elements in zip(*p2_actions)]
+    p2_avg_action = np.asarray(p2_actions, dtype=float).mean(axis=0)
 
     # find best response against average strategy of P2
     p1_br = best_respond(Va, p2_avg_action, T, kappa, lower_limit, upper_limit)
@@ -148,12 +168,17 @@ def welfare(joint_dist, kappa):
     Returns:
         float: Expected total cost (welfare) summed across both players
     """
-    welfare = 0
+    if not joint_dist:
+        return 0.0
+
+    # stack action pairs and their probabilities
+    A = np.array([a for a, b in joint_dist.keys()], dtype=float)
+    B = np.array([b for a, b in joint_dist.keys()], dtype=float)
+    probs = np.array(list(joint_dist.values()))
 
     # compute expected cost of both players
-    for (a, b), prob in joint_dist.items():
-        cost1 = total_cost(a, b, kappa)
-        cost2 = total_cost(b, a, kappa)
-        welfare += prob * (cost1 + cost2)
-    
+    cost1 = total_cost(A, B, kappa)
+    cost2 = total_cost(B, A, kappa)
+    welfare = float(probs @ (cost1 + cost2))
+
     return welfare
\ No newline at end of file